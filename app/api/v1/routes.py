@@ -1,19 +1,32 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, Request, UploadFile, File, HTTPException
 from app.schemas.job import JobSummaryResponse, JobData
-from app.services.pdf_parser import JobPDFParser
-from datetime import datetime
+from app.services.batcher import PDFParseBatcher
+from app.core.clock import current_timestamp
 from typing import Dict, Any, Optional
 
 # Initialize the API router
 router = APIRouter()
 
-# Initialize PDF parser
-pdf_parser = JobPDFParser()
+
+def get_batcher(request: Request) -> PDFParseBatcher:
+    """Return the process-wide batcher built by the app's lifespan."""
+    return request.app.state.batcher
+
+# Upload streaming configuration
+MAX_PDF_SIZE = 10 * 1024 * 1024  # 10MB limit
+UPLOAD_CHUNK_SIZE = 65536  # Read the upload in 64KB chunks
 
 @router.post("/parse-pdf", response_model=JobSummaryResponse)
-async def parse_pdf(file: UploadFile = File(...)):
+async def parse_pdf(
+    file: UploadFile = File(...),
+    include_raw: bool = False,
+    batcher: PDFParseBatcher = Depends(get_batcher),
+):
     """
     Parses an uploaded PDF file and extracts key job information using a generative model.
+
+    Pass include_raw=true to get the raw extracted text snippet in the response;
+    it is omitted by default to keep response payloads small.
     """
     try:
         if not file.filename:
@@ -22,22 +35,42 @@ async def parse_pdf(file: UploadFile = File(...)):
         if file.content_type != "application/pdf":
             raise HTTPException(status_code=400, detail="Only PDF files are allowed")
         
-        content = await file.read()
-        if len(content) > 10 * 1024 * 1024:  # 10MB limit
-            raise HTTPException(status_code=400, detail="File size too large (max 10MB)")
-        
-        job_info_dict = pdf_parser.parse_pdf_with_llm(content)
-        
+        # Read the upload in chunks, enforcing the size cap incrementally so
+        # oversized files are rejected as soon as the threshold is crossed
+        # rather than after buffering the whole body. The chunks are joined
+        # in memory at the end regardless: both the cache key and PyMuPDF
+        # need the full bytes.
+        file_size = 0
+        chunks = []
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            file_size += len(chunk)
+            if file_size > MAX_PDF_SIZE:
+                raise HTTPException(status_code=413, detail="File size too large (max 10MB)")
+            chunks.append(chunk)
+        content = b"".join(chunks)
+
+        # The batcher runs PyMuPDF extraction and the Gemini call off the
+        # event loop, and coalesces uploads arriving in the same window into
+        # one model call.
+        job_info_dict = await batcher.parse(content)
+
+        # The parser reports the full extracted length explicitly; the
+        # raw_text snippet itself is only returned when asked for.
+        raw_text = job_info_dict.pop('raw_text', '')
+        text_length = job_info_dict.pop('text_length', len(raw_text))
+        if include_raw:
+            job_info_dict['raw_text'] = raw_text
+
         extraction_summary = {
             "file_name": file.filename,
-            "file_size_bytes": len(content),
-            "text_length": len(job_info_dict.get('raw_text', '')),
+            "file_size_bytes": file_size,
+            "text_length": text_length,
             "extracted_fields": {
-                field: bool(value and str(value).strip()) 
-                for field, value in job_info_dict.items() 
+                field: bool(value and str(value).strip())
+                for field, value in job_info_dict.items()
                 if field != 'raw_text'
             },
-            "parsing_timestamp": datetime.now().isoformat()
+            "parsing_timestamp": current_timestamp()
         }
         
         job_data = JobData(**job_info_dict)
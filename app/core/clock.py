@@ -0,0 +1,42 @@
+import asyncio
+from datetime import datetime
+
+# Refresh interval for the cached timestamp. Coarse-grained on purpose:
+# response timestamps don't need sub-second precision, and reading a cached
+# string avoids a syscall plus ISO formatting on every request.
+_TICK_INTERVAL = 0.25
+
+_ts_cache = {"v": datetime.now().isoformat()}
+_ticker_task = None
+
+
+def current_timestamp() -> str:
+    """Return an ISO-format timestamp, cached and refreshed by the ticker.
+
+    Falls back to a live value when the ticker isn't running (e.g. outside
+    the application, in scripts or tests).
+    """
+    if _ticker_task is None or _ticker_task.done():
+        return datetime.now().isoformat()
+    return _ts_cache["v"]
+
+
+def start_clock() -> None:
+    """Start the background refresh task. Call once at application startup."""
+    global _ticker_task
+    if _ticker_task is None or _ticker_task.done():
+        _ticker_task = asyncio.get_running_loop().create_task(_tick())
+
+
+def stop_clock() -> None:
+    """Cancel the background refresh task. Call at application shutdown."""
+    global _ticker_task
+    if _ticker_task is not None and not _ticker_task.done():
+        _ticker_task.cancel()
+    _ticker_task = None
+
+
+async def _tick() -> None:
+    while True:
+        _ts_cache["v"] = datetime.now().isoformat()
+        await asyncio.sleep(_TICK_INTERVAL)
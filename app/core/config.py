@@ -1,7 +1,12 @@
-from pydantic import BaseSettings
+from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "PDF Job Parser"
     DEBUG: bool = True
 
+    # Runtime feature switches, overridable via environment variables
+    CORS_ENABLED: bool = True
+    CUSTOM_DOCS: bool = True
+    GEMINI_MODEL: str = "gemini-1.5-flash"
+
 settings = Settings()
@@ -1,49 +1,74 @@
 from fastapi import FastAPI
 from app.api.v1.routes import router
 from fastapi.openapi.docs import get_swagger_ui_html
-from datetime import datetime
+from fastapi.responses import ORJSONResponse
+from app.core.clock import current_timestamp, start_clock, stop_clock
+from app.core.config import settings
+from app.services.batcher import PDFParseBatcher
+from app.services.pdf_parser import JobPDFParser
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import os
 from fastapi.middleware.cors import CORSMiddleware
 
 load_dotenv()
 
-# Create the app without the default Swagger/Redoc
+# Process-wide resources are built exactly once at startup and shared via
+# app.state: one parser (env parsing + Gemini client configuration happen
+# here, not per request) and one batcher, plus the timestamp ticker. Both
+# background tasks are cancelled cleanly at shutdown so reloads don't leave
+# pending tasks to be destroyed mid-flight.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_clock()
+    app.state.parser = JobPDFParser()
+    app.state.batcher = PDFParseBatcher(app.state.parser)
+    yield
+    await app.state.batcher.aclose()
+    stop_clock()
+
+# The app is configured once here; behavior switches (CORS, custom docs,
+# model choice) live in app.core.config.settings rather than in per-variant
+# copies of this module.
 app = FastAPI(
-    docs_url=None,
+    lifespan=lifespan,
+    docs_url=None if settings.CUSTOM_DOCS else "/docs",
     redoc_url=None,
     title="Job Notification PDF Summarizer API",
     description="Extract job details from PDF notifications using AI-powered parsing.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # orjson serializes responses faster than stdlib json
 )
 
 # --- CORS Middleware Configuration ---
 # Allows requests from any origin, which is useful for public APIs
 # or when your frontend is hosted on a different domain.
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # Allows all origins
-    allow_credentials=True,
-    allow_methods=["*"],  # Allows all methods (GET, POST, etc.)
-    allow_headers=["*"],  # Allows all headers
-)
-
-# Custom Swagger UI with dark theme and branding
-@app.get("/docs", include_in_schema=False)
-async def custom_swagger_ui_html():
-    return get_swagger_ui_html(
-        openapi_url=app.openapi_url,
-        title="📄 Job Parser API Docs",
-        swagger_favicon_url="https://fastapi.tiangolo.com/img/favicon.png",
-        swagger_ui_parameters={
-            "defaultModelsExpandDepth": -1,
-            "defaultModelRendering": "model",
-            "docExpansion": "none",
-            "syntaxHighlight.theme": "monokai",
-            "persistAuthorization": True
-        }
+if settings.CORS_ENABLED:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],  # Allows all origins
+        allow_credentials=True,
+        allow_methods=["*"],  # Allows all methods (GET, POST, etc.)
+        allow_headers=["*"],  # Allows all headers
     )
 
+if settings.CUSTOM_DOCS:
+    # Custom Swagger UI with dark theme and branding
+    @app.get("/docs", include_in_schema=False)
+    async def custom_swagger_ui_html():
+        return get_swagger_ui_html(
+            openapi_url=app.openapi_url,
+            title="📄 Job Parser API Docs",
+            swagger_favicon_url="https://fastapi.tiangolo.com/img/favicon.png",
+            swagger_ui_parameters={
+                "defaultModelsExpandDepth": -1,
+                "defaultModelRendering": "model",
+                "docExpansion": "none",
+                "syntaxHighlight.theme": "monokai",
+                "persistAuthorization": True
+            }
+        )
+
 # API v1 routes
 app.include_router(router, prefix="/api/v1")
 
@@ -55,7 +80,7 @@ async def root():
         "message": "Job Notification PDF Summarizer API",
         "version": "1.0.0",
         "status": "active",
-        "last_updated": datetime.now().isoformat(),
+        "last_updated": current_timestamp(),
         "endpoints": {
             "/api/v1/parse-pdf": "POST - Upload and parse a PDF file",
             "/docs": "Swagger UI - API Documentation",
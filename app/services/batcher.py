@@ -0,0 +1,159 @@
+import asyncio
+import orjson
+from typing import Any, Dict, List, Tuple
+
+import google.generativeai as genai
+
+from app.services.pdf_parser import JobPDFParser
+
+
+class PDFParseBatcher:
+    """
+    Micro-batches concurrent PDF parses into single Gemini calls.
+
+    Uploads arriving within a short window are collected from an asyncio
+    queue and sent to the model as one multi-document prompt requesting a
+    JSON array, so a burst of N uploads pays one network round-trip instead
+    of N. A lone item in the window takes the normal single-document path.
+    """
+
+    def __init__(self, parser: JobPDFParser, max_batch: int = 8, max_wait: float = 0.05):
+        self.parser = parser
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue: "asyncio.Queue[Tuple[bytes, str, str, str, asyncio.Future]]" = None
+        self._worker: asyncio.Task = None
+
+    async def parse(self, pdf_content: bytes) -> Dict[str, Any]:
+        """Parse one PDF, transparently batching with concurrent uploads."""
+        # Without a model the parser goes straight to regex; nothing to batch.
+        if not self.parser.model:
+            return await self.parser.parse_pdf_with_llm(pdf_content)
+
+        cache_key = self.parser.cache_key(pdf_content)
+        cached = self.parser._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Full extraction, not budget-truncated: page selection needs to see
+        # every page to pull relevant sections from deep in the document.
+        pages = await asyncio.to_thread(self.parser.extract_page_texts, pdf_content)
+        raw_text = "\n".join(pages) + "\n"
+        prompt_text = self.parser.compress_pages_for_prompt(
+            self.parser.select_relevant_pages(pages)
+        )
+
+        # Text-level cache tier: a repost with different bytes but the same
+        # content doesn't need to join a batch at all.
+        cached = self.parser._cache_get(self.parser.text_cache_key(raw_text))
+        if cached is not None:
+            self.parser._cache_set(cache_key, cached)
+            return cached
+
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((pdf_content, raw_text, prompt_text, cache_key, future))
+        return await future
+
+    async def aclose(self) -> None:
+        """Cancel the drain task cleanly. Call at application shutdown."""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+    def _ensure_worker(self) -> None:
+        """Start the drain task lazily, once a running event loop exists."""
+        if self._worker is None or self._worker.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._drain_loop())
+
+    async def _drain_loop(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = asyncio.get_running_loop().time() + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                if len(batch) == 1:
+                    await self._process_single(batch[0])
+                else:
+                    await self._process_batch(batch)
+            except Exception as e:
+                print(f"Batch worker error: {e}. Resolving items individually.")
+                for item in batch:
+                    if not item[4].done():
+                        await self._process_single(item)
+
+    async def _process_single(self, item: Tuple[bytes, str, str, str, asyncio.Future]) -> None:
+        pdf_content, raw_text, prompt_text, cache_key, future = item
+        try:
+            result = await self.parser.parse_text_with_llm(pdf_content, raw_text, cache_key, prompt_text)
+            if not future.done():
+                future.set_result(result)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+
+    async def _process_batch(self, batch: List[Tuple[bytes, str, str, str, asyncio.Future]]) -> None:
+        prompt = self._build_batch_prompt([prompt_text for _, _, prompt_text, _, _ in batch])
+        generation_config = genai.types.GenerationConfig(
+            response_mime_type="application/json"
+        )
+
+        try:
+            response = await self.parser.model.generate_content_async(
+                prompt, generation_config=generation_config
+            )
+            results = orjson.loads(response.text)
+            if not isinstance(results, list) or len(results) != len(batch):
+                got = (
+                    f"a list of {len(results)}"
+                    if isinstance(results, list)
+                    else type(results).__name__
+                )
+                raise ValueError(
+                    f"Expected a JSON array of {len(batch)} objects, got {got}"
+                )
+        except Exception as e:
+            # One failed mega-call should not fail the whole burst; fall back
+            # to individual calls which carry their own retry logic.
+            print(f"Batched Gemini call failed: {e}. Falling back to individual calls.")
+            for item in batch:
+                await self._process_single(item)
+            return
+
+        for (pdf_content, raw_text, prompt_text, cache_key, future), job_info in zip(batch, results):
+            sanitized = self.parser.sanitize_job_info(job_info, raw_text)
+            self.parser._cache_set(cache_key, sanitized)
+            self.parser._cache_set(self.parser.text_cache_key(raw_text), sanitized)
+            if not future.done():
+                future.set_result(sanitized)
+
+    def _build_batch_prompt(self, prompt_texts: List[str]) -> str:
+        """Concatenate several documents into one prompt requesting a JSON array."""
+        budget = self.parser.PROMPT_CHAR_BUDGET
+        sections = "\n".join(
+            f"--- DOC {i} START ---\n{prompt_text[:budget]}\n--- DOC {i} END ---"
+            for i, prompt_text in enumerate(prompt_texts)
+        )
+        # The shared extraction instructions are the model's system
+        # instruction; only the batch framing and the documents go here.
+        return (
+            f"You will be given {len(prompt_texts)} separate documents, each delimited by "
+            f"'--- DOC i START ---' and '--- DOC i END ---'. Extract the JSON object for every "
+            f"document and output a single JSON array of exactly {len(prompt_texts)} objects, "
+            f"in the same order as the documents. Do not output any other text.\n\n"
+            f"{sections}"
+        )
@@ -1,92 +1,421 @@
+import asyncio
 import fitz  # PyMuPDF
+import hashlib
+import random
 import re
-import json
+import orjson
 import os
+import threading
 import time
+from collections import Counter, OrderedDict
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List
 from dotenv import load_dotenv
+from app.core.config import settings
 
 # Note: The original code had an import 'from app.schemas.job import JobData'
 # which is not used in the class. It can be removed if not needed elsewhere.
 
+__all__ = ["JobPDFParser"]
+
+# Tuned extraction flags: keep whitespace and clipping but skip ligature
+# preservation and image bookkeeping, which the default "text" flags include
+# and neither the LLM prompt nor the regex fallback needs. Dehyphenation
+# rejoins words split across line breaks, which helps both consumers.
+_TEXT_FLAGS = fitz.TEXT_PRESERVE_WHITESPACE | fitz.TEXT_MEDIABOX_CLIP | fitz.TEXT_DEHYPHENATE
+
+# Cleaning/normalization patterns, compiled once at import so the hot paths
+# don't depend on re's internal (LRU-limited) compile cache.
+_NEWLINE_WS = re.compile(r'\s*\n\s*')
+_MULTI_SPACE = re.compile(r' +')
+
+# Leading inline flag groups like (?i)/(?is) must be stripped before patterns
+# can be embedded in an alternation (Python rejects global flags mid-pattern);
+# the fused patterns are compiled with IGNORECASE | DOTALL anyway.
+_INLINE_FLAGS = re.compile(r'^\(\?[aimsux]+\)')
+
+# Trailing commas before a closing brace/bracket, the most common way the
+# model's "JSON" output fails to parse strictly.
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+# Section keywords marking pages that carry the fields we extract; used to
+# prioritize pages when a notification exceeds the prompt budget.
+_RELEVANT_PAGE = re.compile(
+    r'AGE LIMIT|EDUCATIONAL|QUALIFICATION|PAY LEVEL|SCALE OF PAY|PAY MATRIX'
+    r'|vacanc|closing date|apply online',
+    re.IGNORECASE,
+)
+
+
+def _combine_patterns(raw_patterns: Dict[str, List[str]]):
+    """Fuse every field's alternatives into one scannable alternation.
+
+    Each alternative is wrapped in its own named group so a single pass of
+    the engine can report which field a match belongs to (via lastgroup)
+    instead of walking the text once per field. Returns the compiled
+    pattern, a wrapper-name -> field-name map (in priority order), per-
+    wrapper slices into match.groups() covering that alternative's own
+    capture groups, and the set of each field's first-listed alternative.
+    """
+    parts = []
+    fields = {}
+    top_names = set()
+    for field_index, (field, patterns) in enumerate(raw_patterns.items()):
+        for alt_index, pattern in enumerate(patterns):
+            name = f"f{field_index}_{alt_index}"
+            parts.append(f"(?P<{name}>{_INLINE_FLAGS.sub('', pattern)})")
+            fields[name] = field
+            if alt_index == 0:
+                top_names.add(name)
+    combined = re.compile("|".join(parts), re.IGNORECASE | re.DOTALL)
+
+    # The wrappers are the only named groups; an alternative's own capture
+    # groups are numbered between its wrapper and the next one.
+    by_number = sorted(combined.groupindex.items(), key=lambda item: item[1])
+    spans = {}
+    for i, (name, number) in enumerate(by_number):
+        next_number = by_number[i + 1][1] if i + 1 < len(by_number) else combined.groups + 1
+        spans[name] = (number, next_number - 1)
+    return combined, fields, spans, frozenset(top_names)
+
 class JobPDFParser:
     """
     A robust, generic PDF parser for extracting key information from job notifications.
     This version uses Gemini 1.5 Flash in JSON mode for reliable data extraction
     and includes a regex fallback.
     """
+
+    # Character budget for text sent to the model, to stay under token limits
+    PROMPT_CHAR_BUDGET = 30000
+
+    # Static instruction block shared by the single-document and batched prompts
+    PROMPT_INSTRUCTIONS = (
+        "You are an expert data extraction AI. From the following raw text extracted from a government job notification PDF, "
+        "please extract the specified details. The text might be poorly formatted due to the PDF-to-text conversion. "
+        "Your task is to find the relevant information and structure it into a clean JSON object. \n\n"
+        "JSON Keys to extract:\n"
+        "- 'job_title': The official name of the post(s).\n"
+        "- 'department': The name of the ministry or department conducting the recruitment.\n"
+        "- 'vacancies': The total number of vacancies. Extract a number if possible.\n"
+        "- 'eligibility': A combined summary of the required age limits AND educational qualifications. Search for sections like 'Age Limit' and 'Educational Qualifications'.\n"
+        "- 'salary': A summary of the pay scale, including level and initial pay. Actively look for keywords like 'Pay Level', 'Scale of Pay', 'Rs.', or 'Pay Matrix'.\n"
+        "- 'application_deadline': The closing date for applications. Format as YYYY-MM-DD if possible, otherwise keep the original text.\n"
+        "- 'application_url': The official website for applications. Look for text like 'Candidates must apply online through' or website domains ending in '.gov.in' or '.nic.in'.\n\n"
+        "Instructions:\n"
+        "- If a field is genuinely not found after a thorough search, use the string 'Not specified'.\n"
+        "- The output MUST be a valid JSON object. Do not output any other text or explanations.\n\n"
+    )
+
+    # Fallback extraction patterns per field, compiled once at class creation
+    # rather than on every parse_pdf_with_regex call.
+    _RAW_PATTERNS = {
+        'job_title': [r"recruitment for the post of\s*(.+?)(?:\n|$)", r"RECRUITMENT OF (.+?)(?:\n|$)", r"CEN NO\. \d+/\d+ \((.+?)\)"],
+        'department': [r"(?i)(government of india|ministry of .+?|department of .+?|railway recruitment board)"],
+        'vacancies': [r"total vacancies\s*[:\-]?\s*(\d+)", r"grand total\s*[:\-]?\s*(\d+)"],
+        'eligibility': [r"(?is)(?:5.0\s+AGE LIMIT|6.0\s+EDUCATIONAL QUALIFICATIONS|essential qualifications)(.+?)(?=\n\d+\.0|\n\n[A-Z])"],
+        'salary': [r"(?is)(?:SCALE OF PAY|PAY LEVEL|PAY MATRIX)(.+?)(?=\n\d+\.0|\n\n[A-Z])"],
+        'application_deadline': [r"closing date.*?submission of.*?application.*?\n?([^\n]+)"],
+        'application_url': [r"apply online through the website\s*([^\s]+)"]
+    }
+    _COMBINED_PATTERN, _COMBINED_FIELDS, _COMBINED_SPANS, _COMBINED_TOP = _combine_patterns(_RAW_PATTERNS)
+
     def __init__(self):
         load_dotenv()
         # Ensure your .env file has: GEMINI_API_KEY="your_actual_api_key"
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
         self.retry_delays = [1, 2, 4, 8, 16] # Exponential backoff delays
+        self.retry_budget = 20.0 # Wall-clock cap (seconds) on retrying a single request
 
-        # Configure Gemini API
+        # Content-addressed cache of LLM results keyed by SHA-256 of the PDF
+        # bytes. Notifications are deterministic documents, so re-uploads of
+        # the same PDF can skip extraction and the Gemini call entirely.
+        self.cache_ttl = 24 * 60 * 60  # 24h
+        self.cache_max_entries = 128
+        self._llm_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+        # Configure Gemini API. The static instruction block rides along as
+        # the system instruction: it stays byte-identical across calls (a
+        # prerequisite for provider-side prompt caching) and per-request
+        # prompts carry only the document text.
         if self.gemini_api_key:
             genai.configure(api_key=self.gemini_api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
+            self.model = genai.GenerativeModel(
+                settings.GEMINI_MODEL,
+                system_instruction=self.PROMPT_INSTRUCTIONS,
+            )
         else:
             self.model = None
 
-    def extract_all_text(self, pdf_content: bytes) -> str:
-        """Extract all text from PDF using PyMuPDF."""
-        text = ""
+    def cache_key(self, pdf_content: bytes) -> str:
+        """Cache key for a PDF: content hash plus the model that parsed it.
+
+        Including the model name means a GEMINI_MODEL change never serves
+        results produced by a different model.
+        """
+        return f"{hashlib.sha256(pdf_content).hexdigest()}:{settings.GEMINI_MODEL}"
+
+    def text_cache_key(self, raw_text: str) -> str:
+        """Cache key for the extracted text, normalized before hashing.
+
+        Reposted notifications often differ only in whitespace or OCR noise
+        while containing the same text; collapsing whitespace and case before
+        hashing lets those re-uploads hit the cache even though their PDF
+        bytes differ.
+        """
+        normalized = " ".join(raw_text.split()).lower()
+        return f"text:{hashlib.sha256(normalized.encode()).hexdigest()}:{settings.GEMINI_MODEL}"
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return a cached LLM result, dropping it if the TTL has expired."""
+        entry = self._llm_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if time.time() >= expires_at:
+            del self._llm_cache[key]
+            return None
+        self._llm_cache.move_to_end(key)
+        return dict(result)
+
+    def _cache_set(self, key: str, result: Dict[str, Any]) -> None:
+        """Store an LLM result, evicting the least recently used entry if full."""
+        self._llm_cache[key] = (time.time() + self.cache_ttl, dict(result))
+        self._llm_cache.move_to_end(key)
+        while len(self._llm_cache) > self.cache_max_entries:
+            self._llm_cache.popitem(last=False)
+
+    def extract_all_text(self, pdf_content: bytes, max_chars: Optional[int] = None) -> str:
+        """Extract all text from PDF as one string; see extract_page_texts."""
+        return "\n".join(self.extract_page_texts(pdf_content, max_chars)) + "\n"
+
+    def extract_page_texts(self, pdf_content: bytes, max_chars: Optional[int] = None) -> List[str]:
+        """
+        Extract per-page text from PDF using PyMuPDF, parallelizing across pages.
+
+        When max_chars is given, extraction stops as soon as the budget is
+        reached so callers that truncate anyway (like the LLM prompt) don't
+        pay for pages they will never use.
+        """
         try:
+            # One open serves both the page-count probe and the sequential
+            # path; only the threaded path below needs further (per-thread)
+            # Document instances.
             with fitz.open(stream=pdf_content, filetype="pdf") as doc:
-                for page in doc:
-                    text += page.get_text("text") + "\n" # Add a newline between pages
+                page_count = doc.page_count
+
+                max_workers = min(os.cpu_count() or 1, 8, page_count or 1)
+                if max_chars is not None or page_count <= 4 or max_workers <= 1:
+                    # Accumulate into a list and join once: repeated `text +=`
+                    # is quadratic in the number of pages for large documents.
+                    # The budgeted path stays sequential so it can break out
+                    # of the page loop early instead of extracting everything
+                    # up front, and tiny documents skip the pool outright
+                    # since spinning up worker threads costs more than
+                    # extracting a handful of pages.
+                    parts = []
+                    running = 0
+                    for page in doc:
+                        parts.append(page.get_text("text", flags=_TEXT_FLAGS, sort=False))
+                        running += len(parts[-1]) + 1
+                        if max_chars is not None and running >= max_chars:
+                            break
+                    return parts
+
+            # fitz.Document is not thread-safe, so each worker thread opens its
+            # own Document (kept in thread-local storage to avoid reopening per
+            # page). PyMuPDF releases the GIL inside get_text, so the page
+            # extractions genuinely run in parallel.
+            thread_state = threading.local()
+
+            def _extract_page(index: int) -> str:
+                doc = getattr(thread_state, "doc", None)
+                if doc is None:
+                    doc = fitz.open(stream=pdf_content, filetype="pdf")
+                    thread_state.doc = doc
+                return doc[index].get_text("text", flags=_TEXT_FLAGS, sort=False)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # map() preserves submission order, so pages come back in order
+                return list(executor.map(_extract_page, range(page_count)))
         except Exception as e:
             raise Exception(f"Critical error in PyMuPDF text extraction: {str(e)}")
-        return text
 
-    def extract_field(self, text: str, patterns: List[str], group_index: int = 1) -> Optional[str]:
-        """A generic function to try a list of regex patterns until a match is found."""
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
-            if match:
-                return re.sub(r'\s+', ' ', match.group(group_index)).strip()
-        return None
+    def extract_fields(self, text: str) -> Dict[str, Optional[str]]:
+        """Extract all fallback fields in one pass of the combined pattern.
 
-    def parse_pdf_with_llm(self, pdf_content: bytes) -> Dict[str, Any]:
+        Instead of seven independent scans over the same text, the engine
+        walks it once, recording the earliest match of every alternative
+        (lastgroup identifies which one matched). Each field then resolves
+        to its lowest-indexed alternative that matched anywhere — the same
+        priority as trying that field's patterns in list order, so a strong
+        pattern late in the text still beats a weak one on the first line.
+        The scan resumes just past each match's start (not its end) so a
+        long DOTALL section captured for one field cannot swallow another
+        field's match beginning inside it.
+        """
+        found: Dict[str, str] = {}
+        pos = 0
+        # Stop once every field's first-listed alternative has matched: at
+        # that point no later match can change any field's resolution.
+        while not self._COMBINED_TOP <= found.keys():
+            match = self._COMBINED_PATTERN.search(text, pos)
+            if not match:
+                break
+            name = match.lastgroup
+            if name not in found:
+                start, end = self._COMBINED_SPANS[name]
+                groups = match.groups()
+                value = next((g for g in groups[start:end] if g is not None), match.group(0))
+                # split()/join normalizes all whitespace runs in one C-level
+                # pass (leading/trailing included), cheaper than a regex sub
+                # plus strip
+                found[name] = " ".join(value.split())
+            pos = match.start() + 1
+
+        # _COMBINED_FIELDS iterates in declaration order, so the first name
+        # seen for each field is its highest-priority alternative.
+        job_info: Dict[str, Optional[str]] = {key: None for key in self._RAW_PATTERNS}
+        for name, field in self._COMBINED_FIELDS.items():
+            if job_info[field] is None and name in found:
+                job_info[field] = found[name]
+        return job_info
+
+    def select_relevant_pages(self, pages: List[str]) -> List[str]:
+        """
+        Pick the pages worth spending prompt budget on.
+
+        When the document fits the budget anyway, keep everything. Otherwise
+        keep the first page (title/department live there) plus every page
+        mentioning a section keyword (age limit, qualifications, pay,
+        vacancies, closing date, apply online), so blind character
+        truncation stops cutting off the sections the model is asked about.
+        Falls back to the leading pages when no keyword matches.
+        """
+        if sum(map(len, pages)) <= self.PROMPT_CHAR_BUDGET:
+            return pages
+        relevant = [
+            page for index, page in enumerate(pages)
+            if index == 0 or _RELEVANT_PAGE.search(page)
+        ]
+        if len(relevant) <= 1:
+            return pages
+        return relevant
+
+    def compress_pages_for_prompt(self, pages: List[str]) -> str:
+        """
+        Compress extracted pages before they are spent on prompt tokens.
+
+        PDF extraction repeats page headers/footers and page numbers on every
+        page; the model doesn't need them and they eat 30-50% of the
+        character budget on long notifications. Lines appearing on more than
+        half the pages are treated as boilerplate and dropped, as are purely
+        numeric (page number) lines, and runs of whitespace are collapsed.
+        """
+        boilerplate = set()
+        if len(pages) > 1:
+            line_counts = Counter()
+            for page in pages:
+                line_counts.update({line.strip() for line in page.splitlines() if line.strip()})
+            boilerplate = {line for line, count in line_counts.items() if count > len(pages) / 2}
+
+        kept_lines = []
+        for page in pages:
+            for line in page.splitlines():
+                line = " ".join(line.split())
+                if not line or line in boilerplate or line.isdigit():
+                    continue
+                kept_lines.append(line)
+        return "\n".join(kept_lines)
+
+    def build_prompt(self, truncated_text: str) -> str:
+        """Build the single-document user prompt for the Gemini model.
+
+        The extraction instructions live in the model's system instruction,
+        so only the variable document text goes here.
+        """
+        return f"--- PDF TEXT START ---\n{truncated_text}\n--- PDF TEXT END ---"
+
+    def sanitize_job_info(self, job_info: Dict[str, Any], raw_text: str) -> Dict[str, Any]:
+        """Coerce all LLM-returned values to strings and attach the raw text snippet."""
+        sanitized_job_info = {k: str(v) if v is not None else 'Not specified' for k, v in job_info.items()}
+        sanitized_job_info["raw_text"] = raw_text[:1000] # Include a snippet for reference
+        sanitized_job_info["text_length"] = len(raw_text) # Full extracted length, for the route's summary
+        return sanitized_job_info
+
+    async def parse_pdf_with_llm(self, pdf_content: bytes) -> Dict[str, Any]:
         """
         Extracts key job information using the Gemini model with guaranteed JSON output.
         This is the primary and most reliable parsing method.
         """
         if not self.model:
             print("Warning: Gemini API key not found or model not initialized. Falling back to regex parser.")
-            return self.parse_pdf_with_regex(pdf_content)
+            return await asyncio.to_thread(self.parse_pdf_with_regex, pdf_content)
+
+        cache_key = self.cache_key(pdf_content)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+
+        # Extract every page: keyword-based page selection has to see the
+        # whole document, or the sections it exists to rescue (closing
+        # date/pay deep in a 100+ page notification) are never candidates.
+        # Large documents go through the thread pool, and PyMuPDF work
+        # happens off the loop either way.
+        pages = await asyncio.to_thread(self.extract_page_texts, pdf_content)
+        raw_text = "\n".join(pages) + "\n"
+        prompt_text = self.compress_pages_for_prompt(self.select_relevant_pages(pages))
+        return await self.parse_text_with_llm(pdf_content, raw_text, cache_key, prompt_text)
+
+    async def parse_pdfs_with_llm_batch(self, pdf_contents: List[bytes],
+                                        max_concurrency: int = 10) -> List[Dict[str, Any]]:
+        """
+        Parse several PDFs concurrently for bulk ingestion, preserving input
+        order in the returned list. Each item runs the full single-PDF
+        pipeline (cache lookup, retries with backoff, regex fallback), with
+        concurrency capped so a large backlog doesn't fan out unbounded
+        simultaneous Gemini calls.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _one(content: bytes) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.parse_pdf_with_llm(content)
+
+        return list(await asyncio.gather(*(_one(content) for content in pdf_contents)))
+
+    async def parse_text_with_llm(self, pdf_content: bytes, raw_text: str, cache_key: str,
+                                  prompt_text: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run the Gemini extraction over already-extracted text. Split out from
+        parse_pdf_with_llm so the request batcher can reuse it for items that
+        end up being processed individually. prompt_text, when given, is the
+        compressed variant sent to the model; raw_text still backs the
+        response snippet and the regex fallback.
+        """
+        # Second cache tier: same text content under different PDF bytes
+        # (reposts, re-scans) still hits, and the hit is promoted to the
+        # byte-level key so the next identical upload skips extraction too.
+        text_key = self.text_cache_key(raw_text)
+        cached = self._cache_get(text_key)
+        if cached is not None:
+            self._cache_set(cache_key, cached)
+            return cached
 
-        raw_text = self.extract_all_text(pdf_content)
         # Truncate text to avoid exceeding model token limits for very large PDFs
-        truncated_text = raw_text[:30000]
-
-        prompt = (
-            f"You are an expert data extraction AI. From the following raw text extracted from a government job notification PDF, "
-            f"please extract the specified details. The text might be poorly formatted due to the PDF-to-text conversion. "
-            f"Your task is to find the relevant information and structure it into a clean JSON object. \n\n"
-            f"JSON Keys to extract:\n"
-            f"- 'job_title': The official name of the post(s).\n"
-            f"- 'department': The name of the ministry or department conducting the recruitment.\n"
-            f"- 'vacancies': The total number of vacancies. Extract a number if possible.\n"
-            f"- 'eligibility': A combined summary of the required age limits AND educational qualifications. Search for sections like 'Age Limit' and 'Educational Qualifications'.\n"
-            f"- 'salary': A summary of the pay scale, including level and initial pay. Actively look for keywords like 'Pay Level', 'Scale of Pay', 'Rs.', or 'Pay Matrix'.\n"
-            f"- 'application_deadline': The closing date for applications. Format as YYYY-MM-DD if possible, otherwise keep the original text.\n"
-            f"- 'application_url': The official website for applications. Look for text like 'Candidates must apply online through' or website domains ending in '.gov.in' or '.nic.in'.\n\n"
-            f"Instructions:\n"
-            f"- If a field is genuinely not found after a thorough search, use the string 'Not specified'.\n"
-            f"- The output MUST be a valid JSON object. Do not output any other text or explanations.\n\n"
-            f"--- PDF TEXT START ---\n{truncated_text}\n--- PDF TEXT END ---"
-        )
+        truncated_text = (prompt_text if prompt_text is not None else raw_text)[:self.PROMPT_CHAR_BUDGET]
+        prompt = self.build_prompt(truncated_text)
 
         # Configure the model to output JSON directly
         generation_config = genai.types.GenerationConfig(
             response_mime_type="application/json"
         )
 
-        for delay in self.retry_delays:
+        start = time.monotonic()
+        for attempt, delay in enumerate(self.retry_delays):
             try:
-                response = self.model.generate_content(
+                response = await self.model.generate_content_async(
                     prompt,
                     generation_config=generation_config
                 )
@@ -97,48 +426,75 @@ class JobPDFParser:
                     print(f"API call blocked due to: {block_reason}. This is a permanent failure for this prompt.")
                     break # No point in retrying if blocked
 
-                # The model's response text is already a JSON string
-                job_info = json.loads(response.text)
+                # The model's response text is already a JSON string; orjson
+                # parses it a few times faster than stdlib json
+                try:
+                    job_info = orjson.loads(response.text)
+                except orjson.JSONDecodeError:
+                    # The model occasionally emits otherwise-valid JSON with
+                    # trailing commas; strip them and try once more before
+                    # burning a retry on it.
+                    job_info = orjson.loads(_TRAILING_COMMA.sub(r'\1', response.text))
 
                 # Sanitize all values to strings before returning
-                sanitized_job_info = {k: str(v) if v is not None else 'Not specified' for k, v in job_info.items()}
-                sanitized_job_info["raw_text"] = raw_text[:1000] # Include a snippet for reference
+                sanitized_job_info = self.sanitize_job_info(job_info, raw_text)
+                self._cache_set(cache_key, sanitized_job_info)
+                self._cache_set(text_key, sanitized_job_info)
                 return sanitized_job_info
 
-            except json.JSONDecodeError as e:
+            except orjson.JSONDecodeError as e:
                 print(f"API call failed (JSONDecodeError): {e}. Retrying in {delay} seconds...")
-                time.sleep(delay)
+            except (google_exceptions.InvalidArgument,
+                    google_exceptions.PermissionDenied,
+                    google_exceptions.Unauthenticated,
+                    google_exceptions.NotFound) as e:
+                # Auth/request errors won't get better on retry
+                print(f"Permanent API error: {e}. Not retrying.")
+                break
             except Exception as e:
                 print(f"An unexpected API error occurred: {e}. Retrying in {delay} seconds...")
-                time.sleep(delay)
+
+            # No retry follows the final attempt, so sleeping after it would
+            # only delay the fallback.
+            if attempt == len(self.retry_delays) - 1:
+                break
+            # Cap total time spent retrying: give up now if the coming sleep
+            # would overrun the wall-clock budget, rather than noticing only
+            # after having slept it. Jitter keeps concurrent failures from
+            # retrying in lockstep.
+            if time.monotonic() - start + delay > self.retry_budget:
+                print("Retry budget exhausted. Giving up on the API.")
+                break
+            await asyncio.sleep(delay + random.uniform(0, delay * 0.25))
 
         # If all retries fail or the prompt was blocked, fall back to regex
+        # over the text that was already extracted for the prompt — no need
+        # to run PyMuPDF a second time.
         print("All API retries failed. Falling back to regex parser.")
-        return self.parse_pdf_with_regex(pdf_content)
+        return await asyncio.to_thread(self._regex_over_text, raw_text)
 
-    def parse_pdf_with_regex(self, pdf_content: bytes) -> Dict[str, Any]:
+    def parse_pdf_with_regex(self, pdf_content: bytes, raw_text: Optional[str] = None) -> Dict[str, Any]:
         """
         A fallback regex-based parsing logic. Used if the LLM fails.
+
+        Callers that already extracted the text can pass it as raw_text to
+        skip a second PyMuPDF pass over the same document.
         """
-        raw_text = self.extract_all_text(pdf_content)
+        if raw_text is None:
+            raw_text = self.extract_all_text(pdf_content)
+        return self._regex_over_text(raw_text)
+
+    def _regex_over_text(self, raw_text: str) -> Dict[str, Any]:
+        """Run the regex field extraction over already-extracted text."""
         # Basic text cleaning for better regex matching
-        cleaned_text = re.sub(r'\s*\n\s*', '\n', raw_text.strip())
-        cleaned_text = re.sub(r' +', ' ', cleaned_text)
-
-        patterns = {
-            'job_title': [r"recruitment for the post of\s*(.+?)(?:\n|$)", r"RECRUITMENT OF (.+?)(?:\n|$)", r"CEN NO\. \d+/\d+ \((.+?)\)"],
-            'department': [r"(?i)(government of india|ministry of .+?|department of .+?|railway recruitment board)"],
-            'vacancies': [r"total vacancies\s*[:\-]?\s*(\d+)", r"grand total\s*[:\-]?\s*(\d+)"],
-            'eligibility': [r"(?is)(?:5.0\s+AGE LIMIT|6.0\s+EDUCATIONAL QUALIFICATIONS|essential qualifications)(.+?)(?=\n\d+\.0|\n\n[A-Z])"],
-            'salary': [r"(?is)(?:SCALE OF PAY|PAY LEVEL|PAY MATRIX)(.+?)(?=\n\d+\.0|\n\n[A-Z])"],
-            'application_deadline': [r"closing date.*?submission of.*?application.*?\n?([^\n]+)"],
-            'application_url': [r"apply online through the website\s*([^\s]+)"]
-        }
+        cleaned_text = _NEWLINE_WS.sub('\n', raw_text.strip())
+        cleaned_text = _MULTI_SPACE.sub(' ', cleaned_text)
 
-        job_info = {
-            key: self.extract_field(cleaned_text, pat)
-            for key, pat in patterns.items()
-        }
+        if cleaned_text:
+            job_info = self.extract_fields(cleaned_text)
+        else:
+            # Image-only/empty PDFs: don't bother scanning at all
+            job_info = {key: None for key in self._RAW_PATTERNS}
 
         # Ensure all values are strings and replace None with 'Not specified'
         final_job_info = {
@@ -147,4 +503,5 @@ class JobPDFParser:
         }
 
         final_job_info['raw_text'] = cleaned_text[:1000]
+        final_job_info['text_length'] = len(cleaned_text)
         return final_job_info
\ No newline at end of file